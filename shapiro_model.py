@@ -1,13 +1,32 @@
 from rdflib import Graph, URIRef, BNode
-from rdflib.plugins.sparql import prepareQuery
+from rdflib.namespace import RDF, RDFS, OWL, SKOS, DCTERMS, SH
 from rdflib.plugin import PluginException
-from typing import Tuple, List
+from typing import Tuple, List, Iterator
+from operator import attrgetter
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 from shapiro_util import prune_iri, get_logger
-from urllib.parse import urlparse
+import re
 import logging
 
 log = get_logger("SHAPIRO_MODEL")
 
+# rdfs:Property is not part of rdflib's (closed) RDFS namespace
+RDFS_PROPERTY = URIRef("http://www.w3.org/2000/01/rdf-schema#Property")
+# neither is sh:Property part of rdflib's SH namespace
+SHACL_PROPERTY = URIRef("http://www.w3.org/ns/shacl#Property")
+
+# types whose members are not listed as instances of a model
+NON_INSTANCE_TYPES = [
+    RDFS.Class,
+    RDF.Property,
+    RDFS_PROPERTY,
+    OWL.Class,
+    OWL.Ontology,
+    SH.NodeShape,
+    SHACL_PROPERTY,
+]
+
 TYPE_MAP = {
     # maps (unprefixed) XSD datatypes to JSON-Schema types
     "string": "string",
@@ -45,8 +64,20 @@ TYPE_MAP = {
     "NMTOKEN": "string",
     "Name": "string",
     "NCName": "string",
+    "QName": "string",
 }
 
+# JSON-Schema "format" for the XSD datatypes that have one
+TYPE_FORMATS = {
+    "date": "date",
+    "time": "time",
+    "dateTime": "date-time",
+    "dateTimeStamp": "date-time",
+}
+
+# TYPE_MAP by lower-cased XSD datatype name, with the format resolved
+JSON_SCHEMA_TYPES = {k.lower(): (v, TYPE_FORMATS.get(k)) for k, v in TYPE_MAP.items()}
+
 UNQUOTED_TYPES = ["boolean", "number", "integer"]
 
 CONSTRAINT_MAP = {
@@ -87,19 +118,139 @@ ARRAY_ITEM_CONSTRAINTS = [
     "pattern",
 ]
 
+BY_LABEL = attrgetter("label")
+
+SHACL_NAMESPACE = str(SH)
+
+# same scheme rule urlparse applies: an iri without one is a blank node id
+SCHEME = re.compile(r"[A-Za-z][A-Za-z0-9+.\-]*:")
+
+
+def is_blank_node(iri: str) -> bool:
+    return SCHEME.match(iri) is None
+
+
+@lru_cache(maxsize=65536)
+def uri_ref(iri: str) -> URIRef:
+    # the same iris are turned into nodes over and over (rdflib validates each one)
+    return URIRef(iri)
+
+
+def local_name(iri: str) -> str:
+    return iri.rsplit("#", 1)[-1].rsplit("/", 1)[-1]
+
+
+def graph_cache(graph: Graph) -> dict:
+    # indexes and elements derived from a graph are kept on the graph itself
+    # (so they go away with it) and dropped whenever the graph changes size
+    size = len(graph)
+    cache = getattr(graph, "shapiro_cache", None)
+    if cache is None or cache["size"] != size:
+        cache = {"size": size}
+        graph.shapiro_cache = cache
+    return cache
+
+
+def get_element(element_class: type, iri: str, graph: Graph) -> "SemanticModelElement":
+    # construct each element of a graph only once
+    elements = graph_cache(graph).setdefault("elements", {})
+    key = (element_class, str(iri))
+    element = elements.get(key)
+    if element is None:
+        element = element_class(iri, graph)
+        elements[key] = element
+    return element
+
+
+def get_elements(element_class: type, nodes, graph: Graph) -> list:
+    # build each distinct element once, ordered by label
+    elements = []
+    for n in dict.fromkeys(nodes):
+        elements.append(get_element(element_class, n, graph))
+    elements.sort(key=BY_LABEL)
+    return elements
+
+
+def fetch_graph(document: str):
+    # returns the exception instead of raising it, so failures can be cached
+    try:
+        return Graph().parse(document)
+    except Exception as x:
+        return x
+
+
+def get_linked_graph(iri: str, graph: Graph) -> Graph:
+    # documents referenced from a graph are fetched once for as long as that graph
+    # lives; a failed fetch is remembered as well so it is not retried per reference
+    documents = graph_cache(graph).setdefault("documents", {})
+    document = iri.split("#")[0]
+    linked = documents.get(document)
+    if linked is None:
+        linked = fetch_graph(document)
+        documents[document] = linked
+    if isinstance(linked, Exception):
+        raise linked
+    return linked
+
+
+def prefetch_linked_graphs(iris, graph: Graph, max_workers: int = 16):
+    # fetch the linked documents that are not cached yet concurrently - the fetches
+    # are independent and I/O bound; results are stored from the calling thread only
+    documents = graph_cache(graph).setdefault("documents", {})
+    missing = list({iri.split("#")[0] for iri in iris} - documents.keys())
+    if len(missing) == 0:
+        return
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(missing))) as executor:
+        for document, linked in zip(missing, executor.map(fetch_graph, missing)):
+            documents[document] = linked
+
+
+def get_subjects(graph: Graph, predicate: URIRef, object) -> list:
+    # (?, predicate, object) lookups through an object -> subjects map per predicate,
+    # built with one scan of the predicate the first time it is asked for
+    indexes = graph_cache(graph).setdefault("subjects", {})
+    index = indexes.get(predicate)
+    if index is None:
+        index = {}
+        for s, o in graph.subject_objects(predicate):
+            index.setdefault(o, []).append(s)
+        indexes[predicate] = index
+    return index.get(object, [])
+
+
+def description_property(index: int) -> property:
+    # one of the lazily read SemanticModelElement.get_descriptions() values, read-only
+    def getter(self):
+        return self.get_descriptions()[index]
+
+    return property(getter)
+
+
 class Subscriptable:
+    __slots__ = ()
+
     def __getitem__(self, key):
-        if key not in self.__dict__.keys():
-            if key in dir(self):
-                return getattr(self, key)()
-            else:
-                raise Exception(
-                    "Class '{}' does not have property '{}'.".format(type(self), key)
-                )
-        return self.__dict__[key]
+        # attributes are returned as they are, methods are called
+        try:
+            value = getattr(self, key)
+        except AttributeError:
+            raise Exception(
+                "Class '{}' does not have property '{}'.".format(type(self), key)
+            ) from None
+        if callable(value):
+            return value()
+        return value
 
 
 class SemanticModelElement(Subscriptable):
+    __slots__ = (
+        "iri",
+        "graph",
+        "_descriptions",
+        "_ref",
+        "_is_blank",
+    )
+
     RDFS_CLASS = "http://www.w3.org/2000/01/rdf-schema#Class"
     OWL_CLASS = "http://www.w3.org/2002/07/owl#Class"
     RDF_PROPERTY = "http://www.w3.org/1999/02/22-rdf-syntax-ns#Property"
@@ -107,288 +258,147 @@ class SemanticModelElement(Subscriptable):
     SHACL_NODESHAPE = "http://www.w3.org/ns/shacl#NodeShape"
     SHACL_PROPERTY = "http://www.w3.org/ns/shacl#Property"
 
-    TYPE_QUERY = prepareQuery(
-        """
-            PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-            SELECT DISTINCT ?instance ?type
-            WHERE
-            {
-                ?instance rdf:type ?type .
-            }
-            """
-    )
-
-    DESCRIPTION_QUERY = prepareQuery(
-        """
-                PREFIX rdfs:<http://www.w3.org/2000/01/rdf-schema#>
-                PREFIX skos:<http://www.w3.org/2004/02/skos/core#>
-                PREFIX dct: <http://purl.org/dc/terms/>
-                PREFIX owl: <http://www.w3.org/2002/07/owl#>
-                SELECT DISTINCT ?label ?title ?comment ?definition ?description
-                WHERE
-                {
-                    OPTIONAL { ?model rdfs:label ?label . } 
-                    OPTIONAL { ?model dct:title ?title . } 
-                    OPTIONAL { ?model rdfs:comment ?comment . } 
-                    OPTIONAL { ?model dct:description ?description . } 
-                    OPTIONAL { ?model skos:definition ?definition . } 
-                }
-                """
-    )
-
-    PREDICATES_QUERY = prepareQuery(
-        """
-                SELECT DISTINCT ?predicate ?object
-                WHERE
-                {
-                    { ?subject ?predicate ?object }
-                }
-                """
-    )
-
     def __init__(self, iri: str, graph: Graph = None):
-        log.info("Initializing model for {}".format(iri))
+        log.info("Initializing model for %s", iri)
         self.iri = str(iri)  # ensure this is a string, may sometimes be a URIRef object
+        self._is_blank = is_blank_node(self.iri)
+        self._ref = self.get_node(iri)  # built once, reused by all queries on this element
         self.graph = graph
-        self.label, self.title, self.comment, self.description, self.definition = (
-            "",
-            "",
-            "",
-            "",
-            "",
-        )
-        if urlparse(iri).scheme != "":  #  if this is not a blank node
-            if graph is None:
-                self.graph = Graph().parse(iri)
-            (
-                self.label,
-                self.title,
-                self.comment,
-                self.description,
-                self.definition,
-            ) = self.get_label_and_descriptions()
-            if self.label == "" and self.title == "":
-                log.warn(
-                    "Empty title, label, description and comment from graph query. Setting label/title to default for {}".format(
-                        self.iri
+        self._descriptions = None  # read on first access of label, title etc.
+        if not self._is_blank and graph is None:
+            self.graph = Graph().parse(iri)
+
+    def get_descriptions(self) -> tuple:
+        # label, title, comment, description and definition
+        if self._descriptions is None:
+            if not self._is_blank:
+                descriptions = list(self.get_label_and_descriptions())
+                if descriptions[0] == "" and descriptions[1] == "":
+                    log.warning(
+                        "Empty title, label, description and comment from graph query. Setting label/title to default for %s",
+                        self.iri,
                     )
+                    descriptions[0] = descriptions[1] = prune_iri(self.iri, True)
+            else:
+                log.warning(
+                    "Cannot create graph - setting to 'unnamed' 'n/a' for %s", self.iri
                 )
-                self.label = self.title = prune_iri(self.iri, True)
+                descriptions = ["unnamed", "unnamed", "n/a", "n/a", "n/a"]
+            self._descriptions = tuple(descriptions)
+        return self._descriptions
+
+    label = description_property(0)
+    title = description_property(1)
+    comment = description_property(2)
+    description = description_property(3)
+    definition = description_property(4)
+
+    def get_node(self, iri: str):
+        if isinstance(iri, (URIRef, BNode)):
+            return iri  # already a term of the graph, e.g. from a triple lookup
+        if is_blank_node(iri):
+            return BNode(iri)
         else:
-            log.warn(
-                "Cannot create graph - setting to 'unnamed' 'n/a' for {}".format(
-                    self.iri
-                )
-            )
-            self.label = self.title = "unnamed"
-            self.comment = self.description = self.definition = "n/a"
+            return uri_ref(iri)
 
     def get_label_and_descriptions(self) -> Tuple[str, str, str, str, str]:
-        result = self.graph.query(
-            self.DESCRIPTION_QUERY, initBindings={"model": URIRef(self.iri)}
-        )
-        label = ""
-        title = ""
-        comment = "n/a"
-        description = "n/a"
-        definition = "n/a"
-        if result.__len__() == 1:
-            for r in result:
-                if r.label is not None:
-                    label = str(r.label)
-                if r.title is not None:
-                    title = str(r.title)
-                if r.comment is not None:
-                    comment = str(r.comment)
-                if r.description is not None:
-                    description = str(r.description)
-                if r.definition is not None:
-                    definition = str(r.definition)
+        label = self.get_value(RDFS.label, "")
+        title = self.get_value(DCTERMS.title, "")
+        comment = self.get_value(RDFS.comment, "n/a")
+        description = self.get_value(DCTERMS.description, "n/a")
+        definition = self.get_value(SKOS.definition, "n/a")
         return (label, title, comment, description, definition)
 
+    def get_value(self, predicate: URIRef, default: str) -> str:
+        value = self.graph.value(self._ref, predicate)
+        if value is None:
+            return default
+        return str(value)
+
     def get_types(self) -> str:
-        ref = URIRef(self.iri)
-        result = self.graph.query(self.TYPE_QUERY, initBindings={"instance": ref})
         types = []
-        for r in result:
-            types.append(str(r.type))
-        types.sort(key=lambda c: c)
+        for t in self.graph.objects(self._ref, RDF.type):
+            types.append(str(t))
+        types.sort()
         return types
 
     def get_predicates(self) -> dict:
-        result = self.graph.query(
-            self.PREDICATES_QUERY, initBindings={"subject": URIRef(self.iri)}
-        )
         predicates = []
-        for r in result:
-            predicates.append(Predicate(str(r.predicate), self.graph, PredicateValue(str(r.object), self.graph)))
+        for p, o in self.graph.predicate_objects(self._ref):
+            value = get_element(PredicateValue, str(o), self.graph)
+            predicates.append(Predicate(get_element(SemanticModelElement, p, self.graph), value))
         return predicates
     
 
 class PredicateValue(SemanticModelElement):
+    __slots__ = ()
     
     def __init__(self, iri, graph: Graph):
-        url = urlparse(iri)
-        if url.scheme != "" and url.scheme is not None:
+        if not is_blank_node(str(iri)):
             super().__init__(iri, graph)
         else:
-            self.label = iri
+            self._descriptions = (iri, "", "n/a", "n/a", "n/a")
             self.iri = ""
 
+    def get_label_and_descriptions(self) -> Tuple[str, str, str, str, str]:
+        # predicate values are only ever shown by their label
+        label = self.get_value(RDFS.label, "")
+        title = self.get_value(DCTERMS.title, "")
+        return (label, title, "n/a", "n/a", "n/a")
+
 class Predicate(SemanticModelElement):
+    __slots__ = ("element", "value_label", "value_iri")
     
-    def __init__(self, iri: str, graph: Graph, value:PredicateValue):
-        super().__init__(iri, graph)
+    def __init__(self, element: SemanticModelElement, value:PredicateValue):
+        super().__init__(element.iri, element.graph)
+        self.element = element
         self.value_label = value.label
         self.value_iri = value.iri
 
-class RdfProperty(SemanticModelElement):
-    CLASSES_QUERY = prepareQuery(
-        """
-        PREFIX rdfs:<http://www.w3.org/2000/01/rdf-schema#>
-        PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-        SELECT DISTINCT ?result
-        WHERE
-        {
-            {
-                ?property rdf:type rdfs:Property .
-                OPTIONAL { ?property rdfs:domain ?result . }
-            }
-            UNION
-            {
-                ?property rdf:type rdf:Property .
-                OPTIONAL { ?property rdfs:domain ?result . }
-            }
-        }
-        """
-    )
-
-    SUPERPROPS_QUERY = prepareQuery(
-        """
-        PREFIX rdfs:<http://www.w3.org/2000/01/rdf-schema#>
-        PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-        SELECT DISTINCT ?result
-        WHERE
-        {
-            {
-                ?property rdf:type rdfs:Property .
-                OPTIONAL { ?property rdfs:subPropertyOf ?result . }
-            }
-            UNION
-            {
-                ?property rdf:type rdf:Property .
-                OPTIONAL { ?property rdfs:subPropertyOf ?result . }
-            }
-        }
-        """
-    )
-
-    RANGE_QUERY = prepareQuery(
-        """
-        PREFIX rdfs:<http://www.w3.org/2000/01/rdf-schema#>
-        PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-        SELECT DISTINCT ?result
-        WHERE
-        {
-            {
-                ?property rdf:type rdfs:Property .
-                OPTIONAL { ?property rdfs:range ?result . }
-            }
-            UNION
-            {
-                ?property rdf:type rdf:Property .
-                OPTIONAL { ?property rdfs:range ?result . }
-            }
-        }
-        """
-    )
+    def get_descriptions(self) -> tuple:
+        # a predicate's own label and descriptions are the same for each of its values
+        return self.element.get_descriptions()
 
-    KIND_OF_QUERY = prepareQuery(
-        """
-        PREFIX rdfs:<http://www.w3.org/2000/01/rdf-schema#>
-        PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-        SELECT DISTINCT ?result
-        WHERE
-        {
-            ?property rdf:type ?result .
-        }
-        """
-    )
-
-    SHACL_PROP_QUERY = prepareQuery(
-        """ 
-            PREFIX sh:<http://www.w3.org/ns/shacl#>
-            SELECT DISTINCT ?shacl_prop
-            WHERE
-            {
-                ?shacl_prop sh:path ?property .
-            }
-                """
-    )
+class RdfProperty(SemanticModelElement):
+    __slots__ = ()
 
-    def __init__(self, iri: str, graph: Graph):
+    def __init__(self, iri: str, graph: Graph = None):
         super().__init__(iri, graph)
 
-    def query(self, query: str) -> List[str]:
-        qresult = self.graph.query(query, initBindings={"property": URIRef(self.iri)})
+    def get_objects(self, predicate: URIRef) -> List[str]:
         result = []
-        for r in qresult:
-            result.append(str(r.result))
-        result.sort(key=lambda c: c)
+        for o in self.graph.objects(self._ref, predicate):
+            result.append(str(o))
+        result.sort()
         return result
-    
+
     def get_property_kind(self) -> List[str]:
-        return self.query(self.KIND_OF_QUERY)
+        return self.get_objects(RDF.type)
 
     def get_property_type(self) -> List[str]:
-        return self.query(self.RANGE_QUERY)
+        return self.get_objects(RDFS.range)
 
     def get_superproperties(self) -> List[str]:
-        return self.query(self.SUPERPROPS_QUERY)
+        return self.get_objects(RDFS.subPropertyOf)
 
     def get_classes(self) -> List[str]:
-        return self.query(self.CLASSES_QUERY)
+        return self.get_objects(RDFS.domain)
 
     def get_shacl_properties(self) -> List[str]:
-        result = self.graph.query(
-            self.SHACL_PROP_QUERY, initBindings={"property": URIRef(self.iri)}
-        )
-        props = []
-        for r in result:
-            props.append(ShaclProperty(str(r.shacl_prop), self.graph))
-        props.sort(key=lambda p: p.label)
-        return props
+        return get_elements(ShaclProperty, get_subjects(self.graph, SH.path, self._ref), self.graph)
 
     def is_xsd_datatype(self) -> bool:
-        for t in self.get_property_type():
+        # unsorted, stops at the first XSD range
+        for o in self.graph.objects(self._ref, RDFS.range):
+            t = str(o)
             if 'xmlschema#' in t[t.rfind('/'):len(t)].lower():
                 return True
         return False
 
 class NodeShape(SemanticModelElement):
-    SHACL_PROP_QUERY = prepareQuery(
-        """ 
-            PREFIX sh:<http://www.w3.org/ns/shacl#>
-            SELECT DISTINCT ?shacl_prop
-            WHERE
-            {
-                ?shape sh:property ?shacl_prop .
-            }
-        """
-    )
+    __slots__ = ()
 
-    CLASS_QUERY = prepareQuery(
-        """ 
-            PREFIX sh:<http://www.w3.org/ns/shacl#>
-            SELECT DISTINCT ?target
-            WHERE
-            {
-                ?shape sh:targetClass ?target .
-            }
-        """
-    )
-
-    def __init__(self, iri: str, graph: Graph):
+    def __init__(self, iri: str, graph: Graph = None):
         super().__init__(iri, graph)
 
     def get_inherited_shacl_properties(self):
@@ -396,35 +406,23 @@ class NodeShape(SemanticModelElement):
         # find a NodeShape for the class and get the properties from
         # that shape. need to be lenient, ie. if there's no nodeshape,
         # the set is empty, it's not a failure.
-        clazzes = set()
+        superclasses = {}
+        for c in self.graph.objects(self._ref, SH.targetClass):
+            for s in self.graph.transitive_objects(c, RDFS.subClassOf):
+                if s != c:  # transitive_objects starts with the class itself
+                    superclasses[s] = None
         properties = []
-        for c in self.get_classes():
-            clazzes = clazzes | set(c.get_superclasses(True))
-        for c in clazzes:
-            shapes = c.get_nodeshapes()
+        for c in superclasses:
+            shapes = get_elements(NodeShape, get_subjects(self.graph, SH.targetClass, c), self.graph)
             for s in shapes:
                 properties = properties + s.get_shacl_properties()
         return properties
 
     def get_shacl_properties(self) -> List["ShaclProperty"]:
-        result = self.graph.query(
-            self.SHACL_PROP_QUERY, initBindings={"shape": URIRef(self.iri)}
-        )
-        props = []
-        for r in result:
-            props.append(ShaclProperty(str(r.shacl_prop), self.graph))
-        props.sort(key=lambda p: p.label)
-        return props
+        return get_elements(ShaclProperty, self.graph.objects(self._ref, SH.property), self.graph)
 
     def get_classes(self) -> List["RdfClass"]:
-        result = self.graph.query(
-            self.CLASS_QUERY, initBindings={"shape": URIRef(self.iri)}
-        )
-        classes = []
-        for r in result:
-            classes.append(RdfClass(str(r.target), self.graph))
-        classes.sort(key=lambda p: p.label)
-        return classes
+        return get_elements(RdfClass, self.graph.objects(self._ref, SH.targetClass), self.graph)
 
     def get_json_schema_comment(self) -> str:
         no_comment = (
@@ -442,132 +440,53 @@ class NodeShape(SemanticModelElement):
 
 
 class RdfClass(SemanticModelElement):
-    SUPERCLASSES_QUERY = prepareQuery(
-        """
-        PREFIX rdfs:<http://www.w3.org/2000/01/rdf-schema#>
-        SELECT DISTINCT ?superclass
-        WHERE
-        {
-            ?subclass rdfs:subClassOf ?superclass .
-        }
-        """
-    )
-
-    TRANSITIVE_SUPERCLASSES_QUERY = prepareQuery(
-        """
-        PREFIX rdfs:<http://www.w3.org/2000/01/rdf-schema#>
-        SELECT DISTINCT ?superclass
-        WHERE
-        {
-            ?subclass rdfs:subClassOf+ ?superclass .
-        }
-        """
-    )
-
-    PROPERTY_QUERY = prepareQuery(
-        """
-        PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-        PREFIX rdfs:<http://www.w3.org/2000/01/rdf-schema#>
-
-        SELECT DISTINCT ?property
-        WHERE
-        {
-            {
-                ?property rdf:type rdfs:Property .
-                ?property rdfs:domain ?class .
-            }
-            UNION
-            {
-                ?property rdf:type rdf:Property .
-                ?property rdfs:domain ?class .
-            }
-        }
-        """
-    )
+    __slots__ = ()
 
-    SHAPE_QUERY = prepareQuery(
-        """ 
-                PREFIX sh:<http://www.w3.org/ns/shacl#>
-                SELECT DISTINCT ?shape
-                WHERE
-                {
-                    ?shape sh:targetClass ?class .
-                }
-                """
-    )
-
-    INSTANCE_QUERY = prepareQuery(
-        """
-                PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-                PREFIX rdfs:<http://www.w3.org/2000/01/rdf-schema#>
-                SELECT DISTINCT ?instance
-                WHERE
-                {
-                    ?instance rdf:type ?clazz .
-                    ?clazz rdf:type rdfs:Class .
-                }
-                """
-    )
-
-    def __init__(self, iri: str, graph: Graph):
+    def __init__(self, iri: str, graph: Graph = None):
         super().__init__(iri, graph)
 
     def get_properties(self) -> List[RdfProperty]:
-        result = self.graph.query(
-            self.PROPERTY_QUERY, initBindings={"class": URIRef(self.iri)}
-        )
         props = []
-        for r in result:
-            props.append(RdfProperty(str(r.property), self.graph))
-        props.sort(key=lambda c: c.label)
-        return props
+        for p in get_subjects(self.graph, RDFS.domain, self._ref):
+            if (p, RDF.type, RDF.Property) in self.graph or (p, RDF.type, RDFS_PROPERTY) in self.graph:
+                props.append(p)
+        return get_elements(RdfProperty, props, self.graph)
 
     def get_superclasses(self, transitive: bool = False) -> list:
-        query = self.SUPERCLASSES_QUERY
         if transitive == True:
-            query = self.TRANSITIVE_SUPERCLASSES_QUERY
-        result = self.graph.query(query, initBindings={"subclass": URIRef(self.iri)})
-        superclasses = []
-        for r in result:
-            superclasses.append(RdfClass(str(r.superclass), self.graph))
-        superclasses.sort(key=lambda c: c.label)
-        return superclasses
+            # transitive_objects starts with the class itself, which is not its own superclass
+            result = filter(
+                lambda c: c != self._ref,
+                self.graph.transitive_objects(self._ref, RDFS.subClassOf),
+            )
+        else:
+            result = self.graph.objects(self._ref, RDFS.subClassOf)
+        return get_elements(RdfClass, result, self.graph)
 
     def get_nodeshapes(self) -> List[NodeShape]:
-        result = self.graph.query(
-            self.SHAPE_QUERY, initBindings={"class": URIRef(self.iri)}
-        )
-        shapes = []
-        for r in result:
-            shapes.append(NodeShape(str(r.shape), self.graph))
-        shapes.sort(key=lambda c: c.label)
-        return shapes
+        return get_elements(NodeShape, get_subjects(self.graph, SH.targetClass, self._ref), self.graph)
 
     def get_instances(self) -> List["Instance"]:
-        result = self.graph.query(
-            self.INSTANCE_QUERY, initBindings={"clazz": URIRef(self.iri)}
-        )
         instances = []
-        for r in result:
-            instances.append(Instance(r.instance, self.graph))
-        instances.sort(key=lambda c: c.label)
-        return instances
+        if (self._ref, RDF.type, RDFS.Class) in self.graph:
+            instances = self.graph.subjects(RDF.type, self._ref)
+        return get_elements(Instance, instances, self.graph)
 
 
 class ShaclConstraint(Subscriptable):
+    __slots__ = ("parent", "constraint_iri", "local_name", "value", "is_enum")
+
     def __init__(
         self, parent: "ShaclProperty", constraint_iri: str, value: str, is_enum: bool
     ):
         self.parent = parent
         self.constraint_iri = constraint_iri
+        self.local_name = local_name(constraint_iri)
         self.value = value
         self.is_enum = is_enum
 
     def get_json_schema_name(self):
-        for k in CONSTRAINT_MAP.keys():
-            if self.constraint_iri.endswith(k):
-                return CONSTRAINT_MAP[k]
-        return None
+        return CONSTRAINT_MAP.get(self.local_name)
 
     def needs_quotes(self) -> bool:
         try:
@@ -578,118 +497,64 @@ class ShaclConstraint(Subscriptable):
             return True
         
 class ShaclProperty(SemanticModelElement):
-    SHAPE_QUERY = prepareQuery(
-        """ 
-                PREFIX sh:<http://www.w3.org/ns/shacl#>
-                SELECT DISTINCT ?shape
-                WHERE
-                {
-                    ?shape sh:property ?property .
-                }
-                """
-    )
-
-    SHACL_CONSTRAINTS_QUERY = prepareQuery(
-        """ 
-            SELECT DISTINCT ?property ?constraint ?value
-            WHERE
-            {
-                {
-                    ?property ?constraint ?value .
-                    FILTER(STRSTARTS(STR(?constraint), "http://www.w3.org/ns/shacl#")) .
-                }
-            }    
-        """
-    )
-    
-    SHACL_IN_QUERY = prepareQuery(
-        """
-                PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-                PREFIX sh: <http://www.w3.org/ns/shacl#>
-
-                SELECT  ?source ?item
-                WHERE {
-                    ?source sh:in/rdf:rest*/rdf:first ?item
-                }
-            """
-    )
-
-    TRANSITIVE_SUPERPROPERTIES_QUERY = prepareQuery(
-        """
-        PREFIX rdfs:<http://www.w3.org/2000/01/rdf-schema#>
-        
-        SELECT DISTINCT ?superproperty
-        WHERE
-        {
-            {
-                ?subproperty rdfs:subPropertyOf* ?superproperty .
-            }
-            UNION
-            {
-                ?subproperty sh:path ?property.
-                ?property rdfs:subPropertyOf* ?superproperty .
-            }
-        }
-        """
-    )
+    __slots__ = ("_constraints",)
 
-    def __init__(self, iri: str, graph: Graph):
+    def __init__(self, iri: str, graph: Graph = None):
         super().__init__(iri, graph)
-
-    def get_node(self, iri:str):
-        if urlparse(iri).scheme == "":  #  if iri is a blank node
-            return BNode(iri)
-        else:
-            return URIRef(iri)        
+        self._constraints = None
+
+    def get_constraint_nodes(self) -> list:
+        # this property and its potential super-properties, all of which may carry constraints
+        # (transitive_objects starts with the node itself)
+        nodes = list(self.graph.transitive_objects(self._ref, RDFS.subPropertyOf))
+        for p in self.graph.objects(self._ref, SH.path):
+            nodes += self.graph.transitive_objects(p, RDFS.subPropertyOf)
+        return list(dict.fromkeys(nodes))
+
+    def iter_constraints(self) -> Iterator[ShaclConstraint]:
+        # unordered and not cached - see get_constraints_by_name()
+        for n in self.get_constraint_nodes(): # get all constraints including those from super-properties
+            for p, o in self.graph.predicate_objects(n):
+                c = str(p)
+                if not c.startswith(SHACL_NAMESPACE):
+                    continue
+                v = str(o)
+                is_enum = False
+                if c.endswith("shacl#in"):
+                    is_enum = True
+                    v = []
+                    for items in self.graph.objects(self._ref, SH["in"]):
+                        v += self.graph.items(items)
+                yield ShaclConstraint(self, c, v, is_enum)
+
+    def get_constraints_by_name(self) -> dict:
+        # constraints by their name in the shacl namespace (e.g. "datatype", "minCount"),
+        # collected on first use - the JSON-SCHEMA accessors below all look them up
+        if self._constraints is None:
+            constraints = {}
+            for c in self.iter_constraints():
+                constraints.setdefault(c.local_name, []).append(c)
+            self._constraints = constraints
+        return self._constraints
+
+    def get_constraints_named(self, name: str) -> List[ShaclConstraint]:
+        return self.get_constraints_by_name().get(name, [])
 
     def get_constraints(self) -> List[ShaclConstraint]:
-        props = []
-        result = self.graph.query( # get prop and potential super-properties
-            self.TRANSITIVE_SUPERPROPERTIES_QUERY, initBindings={"subproperty": self.get_node(self.iri)}
-        )
-        for r in result:
-            props.append(str(r.superproperty))
-        result = []
-        for p in props: # get all constraints including those from super-properties
-            result += self.graph.query(
-                self.SHACL_CONSTRAINTS_QUERY, initBindings={"property": self.get_node(str(p))}
-            )
         constraints = []
-        for r in result:
-            p = str(r.property)
-            c = str(r.constraint)
-            v = str(r.value)
-            is_enum = False
-            if c.endswith("shacl#in"):
-                is_enum = True
-                v = []
-                if urlparse(p).scheme == "":  #  if p is a blank node
-                    prop = BNode(self.iri)
-                else:
-                    prop = URIRef(self.iri)
-                items = self.graph.query(
-                    self.SHACL_IN_QUERY, initBindings={"source": prop}
-                )
-                for i in items:
-                    v.append(i.item)
-            constraints.append(ShaclConstraint(self, c, v, is_enum))
-        constraints.sort(key=lambda c: c.constraint_iri)
+        for c in self.get_constraints_by_name().values():
+            constraints += c
+        constraints.sort(key=attrgetter("constraint_iri"))
         return constraints
 
     def is_required(self):
-        constraints = self.get_constraints()
-        minCount = list(
-            filter(lambda c: c.constraint_iri.lower().endswith("mincount"), constraints)
-        )
+        minCount = self.get_constraints_named("minCount")
         if len(minCount) == 1:
             return int(minCount[0].value) >= 1
         return False
 
     def is_array(self):
-        constraints = self.get_constraints()
-        maxCount = list(
-            filter(lambda c: c.constraint_iri.lower().endswith("maxcount"), constraints)
-        )
+        maxCount = self.get_constraints_named("maxCount")
         if len(maxCount) == 1:
             return int(maxCount[0].value) > 1
         return False
@@ -700,18 +565,9 @@ class ShaclProperty(SemanticModelElement):
         # if there is only one, but not if there are multiple nodeshapes in the same model
         t = self.xsd_datatype()
         if t is not None:
-            for k in TYPE_MAP.keys():
-                if t.lower().endswith(
-                    k.lower()
-                ):  # TODO: endswith is going to collide with names of classes!!
-                    # add format for date/time
-                    if k == "date":
-                        return (TYPE_MAP[k], "date")
-                    if k == "time":
-                        return (TYPE_MAP[k], "time")
-                    if k == "dateTime" or k == "dateTimeStamp":
-                        return (TYPE_MAP[k], "date-time")
-                    return (TYPE_MAP[k], None)
+            jstype = JSON_SCHEMA_TYPES.get(local_name(t).lower())
+            if jstype is not None:
+                return jstype
             # must be an object reference, make sure we point to a NodeShape
             # so JSON-SCHEMA tooling can resolve the $ref to that NodeShape's
             # JSON-SCHEMA through Shapiro
@@ -721,13 +577,11 @@ class ShaclProperty(SemanticModelElement):
         return None  # no mapping found, return None meaning no constraint is put in JSON-SCHEMA
 
     def get_target_property(self) -> RdfProperty:
-        targets = list(
-            filter(lambda c: c.constraint_iri.endswith("path"), self.get_constraints())
-        )
+        targets = self.get_constraints_named("path")
         target_iri = self.iri
         if len(targets) > 0:
             target_iri = targets[0].value
-        return RdfProperty(target_iri, self.graph)
+        return get_element(RdfProperty, target_iri, self.graph)
 
     def get_iri(self) -> str:
         # if this SHACL property is a blank node, then return the iri of the target property, otherwise return the original iri of this property
@@ -756,32 +610,48 @@ class ShaclProperty(SemanticModelElement):
 
     def get_json_schema_array_item_constraints(self) -> List[ShaclConstraint]:
         if self.is_array():
-            return list(
-                filter(
-                    lambda c: c.get_json_schema_name() in ARRAY_ITEM_CONSTRAINTS,
-                    self.get_constraints(),
-                )
-            )
+            return [
+                c
+                for c in self.get_constraints()
+                if c.get_json_schema_name() in ARRAY_ITEM_CONSTRAINTS
+            ]
         return []
 
     def get_nodeshape_for(self, iri: str) -> str:
-        s = SemanticModel(iri)
-        types = s.get_types()
-        nodeshapes = list(filter(lambda t: t.lower().endswith("nodeshape"), types))
-        if len(nodeshapes) > 0:
+        # the same targets are referenced by many properties of a model
+        resolved = graph_cache(self.graph).setdefault("nodeshapes", {})
+        if iri not in resolved:
+            resolved[iri] = self.resolve_nodeshape_for(iri)
+        return resolved[iri]
+
+    def is_typed_locally(self, iri: str) -> bool:
+        # whether this graph already says iri is a class or a nodeshape
+        for t in self.graph.objects(uri_ref(iri), RDF.type):
+            t = str(t).lower()
+            if t.endswith("class") or t.endswith("nodeshape"):
+                return True
+        return False
+
+    def resolve_nodeshape_for(self, iri: str) -> str:
+        # only fetch the document of iri if this graph doesn't tell what iri is
+        graph = self.graph
+        if not self.is_typed_locally(iri):
+            graph = get_linked_graph(iri, self.graph)
+        types = [str(t) for t in graph.objects(uri_ref(iri), RDF.type)]
+        if any(t.lower().endswith("nodeshape") for t in types):
             # iri is a nodeshape
             return iri
-        classes = list(filter(lambda t: t.lower().endswith("class"), types))
-        if len(classes) > 0:
+        if any(t.lower().endswith("class") for t in types):
             # iri is a class, find nodeshape with this class as targetclass in the model
-            clazz = RdfClass(iri, self.graph)
+            clazz = get_element(RdfClass, iri, self.graph)
             nodeshapes = clazz.get_nodeshapes()
             l = len(nodeshapes)
             if l > 1:
-                log.warn(
-                    "Found {} nodeshapes for class {}. Selecting {}.".format(
-                        l, iri, nodeshapes[0].iri
-                    )
+                log.warning(
+                    "Found %s nodeshapes for class %s. Selecting %s.",
+                    l,
+                    iri,
+                    nodeshapes[0].iri,
                 )
             if l > 0:
                 return nodeshapes[0].iri
@@ -789,256 +659,153 @@ class ShaclProperty(SemanticModelElement):
 
     def xsd_datatype(self) -> str:
         # TODO: what if multiple datatypes are defined?
-        constraints = self.get_constraints()
-        datatype = list(
-            filter(lambda c: c.constraint_iri.lower().endswith("datatype"), constraints)
-        )
+        datatype = self.get_constraints_named("datatype")
         if len(datatype) == 1:  # must be simple type
             return datatype[0].value
         return None
 
     def class_datatype(self) -> str:
         # TODO: what if multiple datatypes are defined?
-        constraints = self.get_constraints()
-        datatype = list(
-            filter(lambda c: c.constraint_iri.lower().endswith("class"), constraints)
-        )
+        datatype = self.get_constraints_named("class")
         if len(datatype) == 1:  # relationship to instances of another class
             return datatype[0].value
         return None
 
     def is_object_reference(self) -> bool:
-        constraints = self.get_constraints()
-        datatype = list(
-            filter(lambda c: c.constraint_iri.lower().endswith("datatype"), constraints)
-        )
+        datatype = self.get_constraints_named("datatype")
         if len(datatype) == 1:  # must be simple type
             return False
-        datatype = list(
-            filter(lambda c: c.constraint_iri.lower().endswith("class"), constraints)
-        )
+        datatype = self.get_constraints_named("class")
         if len(datatype) == 1:  # relationship to instances of another class
             return True
         return False  # meaning we will not put any constraint in JSON-SCHEMA
 
     def get_nodeshapes(self) -> List[NodeShape]:
-        prop = None
-        if urlparse(self.iri).scheme == "":  #  if this is a blank node
-            prop = BNode(self.iri)
-        else:
-            prop = URIRef(self.iri)
-        result = self.graph.query(self.SHAPE_QUERY, initBindings={"property": prop})
-        shapes = []
-        for r in result:
-            shapes.append(NodeShape(str(r.shape), self.graph))
-        shapes.sort(key=lambda s: s.label)
-        return shapes
+        return get_elements(NodeShape, get_subjects(self.graph, SH.property, self._ref), self.graph)
 
 
 class Instance(SemanticModelElement):
-    CLASS_QUERY = prepareQuery(
-        """
-                PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-                PREFIX rdfs:<http://www.w3.org/2000/01/rdf-schema#>
-                PREFIX owl: <http://www.w3.org/2002/07/owl#> 
-                PREFIX sh:<http://www.w3.org/ns/shacl#>
-                SELECT DISTINCT ?clazz
-                WHERE
-                {
-                    ?instance rdf:type ?clazz .
-                    ?class rdf:type rdfs:Class
-                }
-                """
-    )
+    __slots__ = ()
 
-    def __init__(self, iri: str, graph: Graph):
+    def __init__(self, iri: str, graph: Graph = None):
         super().__init__(iri, graph)
 
     def get_classes(self) -> RdfClass:
-        result = self.graph.query(
-            self.CLASS_QUERY, initBindings={"instance": URIRef(self.iri)}
-        )
-        clazzes = []
-        for r in result:
-            clazzes.append(RdfClass(r.clazz, self.graph))
-        clazzes.sort(key=lambda c: c.label)
-        return clazzes
+        # all types of the instance, as long as the graph declares any rdfs:Class at all
+        # (this is what the former CLASS_QUERY returned, its class pattern was not joined)
+        if (None, RDF.type, RDFS.Class) not in self.graph:
+            return []
+        return get_elements(RdfClass, self.graph.objects(self._ref, RDF.type), self.graph)
 
 
 class SemanticModel(SemanticModelElement):
-    MODEL_DETAILS_QUERY = prepareQuery(
-        """
-                PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-                PREFIX owl: <http://www.w3.org/2002/07/owl#>
-                SELECT DISTINCT ?property ?value
-                WHERE
-                {
-                    ?model rdf:type owl:Ontology .
-                    ?model ?property ?value .
-                }
-                """
-    )
+    __slots__ = ()
 
-    CLASS_QUERY = prepareQuery(
-        """
-                PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-                PREFIX rdfs:<http://www.w3.org/2000/01/rdf-schema#>
-                PREFIX sh:  <http://www.w3.org/ns/shacl#>
-                PREFIX owl: <http://www.w3.org/2002/07/owl#> 
-                SELECT DISTINCT ?instance
-                WHERE
-                {
-                    {
-                        {?instance rdf:type rdfs:Class .}
-                        UNION 
-                        { ?instance rdf:type owl:Class . }
-                        UNION
-                        {?instance rdfs:subClassOf rdfs:Class .}
-                    }
-                    MINUS {
-                        ?instance rdf:type rdf:Property .                        
-                        ?instance rdf:type rdfs:Property .
-                        ?instance rdf:type sh:property .
-                        ?instance rdf:type sh:PropertyShape .
-                    }                    
-                }
-                """
-    )
-
-    SHACL_PROP_QUERY = prepareQuery(
-        """
-                PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-                PREFIX sh:  <http://www.w3.org/ns/shacl#>
-                SELECT DISTINCT ?property
-                WHERE
-                {
-                    { ?shape sh:property ?property }
-                    UNION
-                    { ?property rdf:type sh:Property }
-                }
-                """
-    )
-
-    INSTANCE_QUERY = prepareQuery(
-        """
-                PREFIX rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#>
-                PREFIX rdfs:<http://www.w3.org/2000/01/rdf-schema#>
-                PREFIX owl: <http://www.w3.org/2002/07/owl#> 
-                PREFIX sh:  <http://www.w3.org/ns/shacl#>
-                SELECT DISTINCT ?instance
-                WHERE
-                {
-                    ?instance rdf:type ?clazz .
-                    MINUS
-                    {
-                          ?instance rdf:type rdfs:Class .
-                    }
-                    MINUS
-                    {
-                          ?instance rdf:type rdf:Property . 
-                    }
-                    MINUS
-                    {
-                          ?instance rdf:type rdfs:Property . 
-                    }
-                    MINUS
-                    {
-                          ?instance rdf:type owl:Class . 
-                    }
-                    MINUS
-                    {
-                          ?instance rdf:type owl:Ontology . 
-                    }
-                    MINUS
-                    {
-                          ?instance rdf:type sh:NodeShape . 
-                    }
-                    MINUS
-                    {
-                          ?instance rdf:type sh:Property . 
-                    }
-                }
-                """
-    )
-
-    def __init__(self, iri: str):
-        super().__init__(iri)
+    def __init__(self, iri: str, graph: Graph = None):
+        super().__init__(iri, graph)
         
     def get_model_details_for_iri(self, iri) -> dict:
-        result = self.graph.query(
-            self.MODEL_DETAILS_QUERY, initBindings={"model": URIRef(iri)}
-        )
         details = {}
-        for r in result:
-            details[str(r.property)] = str(r.value)
+        model = uri_ref(iri)
+        if (model, RDF.type, OWL.Ontology) in self.graph:
+            for p, v in self.graph.predicate_objects(model):
+                details[str(p)] = str(v)
         return details
 
     def get_model_details(self) -> dict:
-        result = self.get_model_details_for_iri(self.iri)
-        if result == {} and not (self.iri.endswith("/") or self.iri.endswith("#")):
-            result = self.get_model_details_for_iri(self.iri + "/")
-            if result == {}:
-                result = self.get_model_details_for_iri(self.iri + "#")
-        return result
+        # the ontology may be declared with or without a trailing '/' or '#'
+        candidates = [self.iri]
+        if not (self.iri.endswith("/") or self.iri.endswith("#")):
+            candidates += [self.iri + "/", self.iri + "#"]
+        ontologies = set(map(str, self.graph.subjects(RDF.type, OWL.Ontology)))
+        for c in candidates:
+            if c in ontologies:
+                return self.get_model_details_for_iri(c)
+        return {}
 
     def get_types_of_instance(self, instance_iri: str) -> str:
-        result = self.graph.query(
-            self.TYPE_QUERY, initBindings={"instance": URIRef(instance_iri)}
-        )
         types = []
-        for r in result:
-            types.append(str(r.type))
-        types.sort(key=lambda c: c)
+        for t in self.graph.objects(uri_ref(instance_iri), RDF.type):
+            types.append(str(t))
+        types.sort()
         return types
 
-    def get_instances_of_type(self, type_iri: str, type_class: type) -> list:
-        type_ref = URIRef(type_iri)
-        result = self.graph.query(self.TYPE_QUERY, initBindings={"type": type_ref})
-        instances = []
-        for r in result:
-            instances.append(type_class(str(r.instance), self.graph))
-        return instances
+    def get_typed(self, type_ref: URIRef) -> set:
+        return set(self.graph.subjects(RDF.type, type_ref))
+
+    def get_class_nodes(self) -> set:
+        # we explicitly need to exclude rdfs & shacl properties (which end up being classes themselves),
+        # i.e. terms typed as rdf:Property, rdfs:Property, sh:property and sh:PropertyShape all at once
+        cache = graph_cache(self.graph)
+        if "classes" not in cache:
+            classes = self.get_typed(RDFS.Class) | self.get_typed(OWL.Class)
+            classes |= set(self.graph.subjects(RDFS.subClassOf, RDFS.Class))
+            properties = self.get_typed(RDF.Property)
+            for t in [RDFS_PROPERTY, SH.property, SH.PropertyShape]:
+                properties &= self.get_typed(t)
+            cache["classes"] = classes - properties
+        return cache["classes"]
+
+    def get_instance_nodes(self) -> set:
+        # everything that has a type, unless it is typed as a class, property, ontology or shape
+        cache = graph_cache(self.graph)
+        if "instances" not in cache:
+            instances = set(self.graph.subjects(RDF.type, None))
+            for t in NON_INSTANCE_TYPES:
+                instances -= self.get_typed(t)
+            cache["instances"] = instances
+        return cache["instances"]
 
     def get_classes(self) -> List[RdfClass]:
-        # can't use the generic query here as we explicitly need to exclude rdfs & shacl properties
-        # (which end up being classes themselves)
-        result = self.graph.query(self.CLASS_QUERY)
-        classes = []
-        for r in result:
-            classes.append(RdfClass(str(r.instance), self.graph))
-        classes.sort(key=lambda c: c.label)
-        return classes
+        return get_elements(RdfClass, sorted(self.get_class_nodes()), self.graph)
+
+    def get_class(self, iri: str) -> RdfClass:
+        # the class with the specified iri, if this model has it, without building all the others
+        ref = uri_ref(iri)
+        return get_element(RdfClass, ref, self.graph) if ref in self.get_class_nodes() else None
 
     def get_instances(self) -> List[Instance]:
-        result = self.graph.query(self.INSTANCE_QUERY)
-        instances = []
-        for r in result:
-            instances.append(Instance(r.instance, self.graph))
-        instances.sort(key=lambda c: c.label)
-        return instances
+        return get_elements(Instance, sorted(self.get_instance_nodes()), self.graph)
+
+    def get_instance(self, iri: str) -> Instance:
+        return get_element(Instance, uri_ref(iri), self.graph) if self.is_instance(iri) else None
 
     def is_instance(self, iri: str) -> bool:
-        result = self.graph.query(self.INSTANCE_QUERY)
-        for r in result:
-            if str(r.instance) == iri:
-                return True
-        return False
+        cache = graph_cache(self.graph)
+        if "instance_iris" not in cache:
+            cache["instance_iris"] = set(map(str, self.get_instance_nodes()))
+        return iri in cache["instance_iris"]
 
     def get_properties(self) -> List[RdfProperty]:
-        result = self.get_instances_of_type(self.RDFS_PROPERTY, RdfProperty)
-        result += self.get_instances_of_type(self.RDF_PROPERTY, RdfProperty)
-        result.sort(key=lambda c: c.label)
-        return result
+        # a property typed both rdfs:Property and rdf:Property is listed once
+        properties = set(self.graph.subjects(RDF.type, RDFS_PROPERTY))
+        properties |= set(self.graph.subjects(RDF.type, RDF.Property))
+        return get_elements(RdfProperty, properties, self.graph)
+
+    def get_property(self, iri: str) -> RdfProperty:
+        ref = uri_ref(iri)
+        if (ref, RDF.type, RDFS_PROPERTY) in self.graph or (ref, RDF.type, RDF.Property) in self.graph:
+            return get_element(RdfProperty, ref, self.graph)
+        return None
 
     def get_node_shapes(self) -> List[NodeShape]:
-        shapes = self.get_instances_of_type(self.SHACL_NODESHAPE, NodeShape)
-        shapes.sort(key=lambda c: c.label)
-        return shapes
+        return get_elements(NodeShape, self.graph.subjects(RDF.type, SH.NodeShape), self.graph)
+
+    def get_node_shape(self, iri: str) -> NodeShape:
+        ref = uri_ref(iri)
+        if (ref, RDF.type, SH.NodeShape) in self.graph:
+            return get_element(NodeShape, ref, self.graph)
+        return None
 
     def get_shacl_properties(self) -> List[ShaclProperty]:
-        result = self.graph.query(self.SHACL_PROP_QUERY)
-        props = []
-        for r in result:
-            props.append(ShaclProperty(str(r.property), self.graph))
-        props.sort(key=lambda c: c.label)
-        return props
+        # properties of a shape as well as properties typed sh:Property
+        properties = set(self.graph.objects(None, SH.property))
+        properties |= set(self.graph.subjects(RDF.type, SHACL_PROPERTY))
+        return get_elements(ShaclProperty, properties, self.graph)
+
+    def get_shacl_property(self, iri: str) -> ShaclProperty:
+        # same patterns as get_shacl_properties(), for a single property
+        ref = uri_ref(iri)
+        if (None, SH.property, ref) in self.graph or (ref, RDF.type, SHACL_PROPERTY) in self.graph:
+            return get_element(ShaclProperty, ref, self.graph)
+        return None
@@ -2,8 +2,8 @@ from liquid import Environment
 from liquid import Mode
 from liquid import StrictUndefined
 from liquid import FileSystemLoader
-from urllib.parse import urlparse
 from urllib.error import HTTPError
+from rdflib import Graph
 from shapiro_model import (
     Subscriptable,
     RdfClass,
@@ -13,6 +13,8 @@ from shapiro_model import (
     ShaclConstraint,
     ShaclProperty,
     NodeShape,
+    prefetch_linked_graphs,
+    is_blank_node,
 )
 from shapiro_util import (
     NotFoundException,
@@ -21,18 +23,25 @@ from shapiro_util import (
     get_logger,
 )
 import markdown as md
-import multiline
+import json
 from typing import List
+from functools import lru_cache
 import re
 
 log = get_logger("SHAPIRO_RENDER")
 
 def url(value: str) -> str:
-    url = urlparse(value)
-    if url.scheme != "" and url.scheme is not None:
+    if not is_blank_node(value):  # i.e. value has a scheme
         return '<a href="' + value + '" data-bs-toggle="tooltip" data-bs-original-title="' + value + '">' + prune_iri(value) + "</a>"
     return value
 
+@lru_cache(maxsize=4096)
+def markdown(value: str) -> str:
+    # comments repeat a lot across a page (blank, "n/a", shared sibling comments)
+    if not value:
+        return value
+    return md.markdown(value)
+
 def extract_namespace(iri:str):
     if iri.endswith('/'):
         iri = iri[0:len(iri)-1]
@@ -50,6 +59,10 @@ def extract_namespace(iri:str):
 
 def get_id(iri:str):
     return iri.replace(':','_').replace('/','_').replace('.','_')    
+
+def get_model_iri(iri:str):
+    # the model an element belongs to is the iri up to its last path segment
+    return iri[0:iri.rfind('/')]
         
 class MermaidProperty(Subscriptable):
     
@@ -107,11 +120,12 @@ class MermaidRenderer:
             tolerance=Mode.STRICT,
             undefined=StrictUndefined,
             loader=FileSystemLoader(template_path),
+            auto_reload=False,  # templates are parsed once, no mtime check per render
         )
         
-    def render_model(self, model_iri:str) -> str:
+    def render_model(self, model_iri:str, graph: Graph = None) -> str:
         log.info("Rendering model diagram for {}".format(model_iri))
-        s = SemanticModel(model_iri)
+        s = SemanticModel(model_iri, graph)
         classes = []
         connections = []
         for c in s.get_classes():
@@ -195,27 +209,27 @@ class MermaidRenderer:
                     connections.append(MermaidConnection(result.id, target.id, MermaidConnection.ASSOCIATION, label))                
         return classes, list(set(connections))
     
-    def render_class(self, iri:str) -> str:
+    def render_class(self, iri:str, graph: Graph = None) -> str:
         log.info("Rendering class diagram for {}".format(iri))
-        s = SemanticModel(iri)
+        s = SemanticModel(iri, graph)
         classes = []
         connections = []
-        for c in s.get_classes():
-            if c.iri == s.iri:
-                classes, connections = self.get_class_structure(c)
+        c = s.get_class(s.iri)
+        if c is not None:
+            classes, connections = self.get_class_structure(c)
         return self.env.get_template("render.mermaid").render(
             classes=classes,
             connections=connections
         )
         
-    def render_nodeshape(self, iri:str) -> str:
+    def render_nodeshape(self, iri:str, graph: Graph = None) -> str:
         log.info("Rendering class diagram for {}".format(iri))
-        s = SemanticModel(iri)
+        s = SemanticModel(iri, graph)
         classes = []
         connections = []
-        for c in s.get_node_shapes():
-            if c.iri == s.iri:
-                classes, connections = self.get_shape_structure(c)
+        c = s.get_node_shape(s.iri)
+        if c is not None:
+            classes, connections = self.get_shape_structure(c)
         return self.env.get_template("render.mermaid").render(
             classes=classes,
             connections=connections
@@ -227,6 +241,7 @@ class JsonSchemaRenderer:
             tolerance=Mode.STRICT,
             undefined=StrictUndefined,
             loader=FileSystemLoader(template_path),
+            auto_reload=False,
         )
 
     def convert_shacl_constraints(
@@ -236,14 +251,15 @@ class JsonSchemaRenderer:
         for c in shacl_constraints:
             name = c.get_json_schema_name()
             if name is not None:
+                needs_quotes = c.needs_quotes()
                 d = {
                     "name": name,
-                    "needs_quotes": c.needs_quotes(),
+                    "needs_quotes": needs_quotes,
                     "value": c.value,
                 }
                 delim = ""
                 remove = 2
-                if c.needs_quotes() is True:
+                if needs_quotes is True:
                     delim = '"'
                     remove = 3
                 if c.is_enum is True:
@@ -260,10 +276,21 @@ class JsonSchemaRenderer:
         properties = (
             []
         )  # list of dicts with all information for each property, including constraints
+        property_iris = set()
         shacl_props = shape.get_shacl_properties()
         shacl_props = shacl_props + shape.get_inherited_shacl_properties()
+        # object references not typed in this model are resolved against their own
+        # documents, fetch those up front
+        prefetch_linked_graphs(
+            [
+                p.class_datatype()
+                for p in shacl_props
+                if p.is_object_reference() and not p.is_typed_locally(p.class_datatype())
+            ],
+            shape.graph,
+        )
         for p in shacl_props:
-            name = p.get_json_schema_name()
+            is_array = p.is_array()
             jstype = p.get_json_schema_type()
             type = None
             format = None
@@ -275,7 +302,7 @@ class JsonSchemaRenderer:
                 "type": type,
                 "format": format,
                 "is_object": p.is_object_reference(),
-                "is_array": p.is_array(),
+                "is_array": is_array,
                 "name": p.get_json_schema_name(),
                 "description": p.get_json_schema_comment(),
                 "is_required": p.is_required(),
@@ -284,19 +311,22 @@ class JsonSchemaRenderer:
                 p.get_json_schema_array_item_constraints()
             )
             prop["array_item_constraint_count"] = len(prop["array_item_constraints"])
+            array_item_constraints = {
+                (d["name"], d["value"]) for d in prop["array_item_constraints"]
+            }
             prop["constraints"] = []
             for d1 in self.convert_shacl_constraints(p.get_constraints()):
-                is_array_item_constraint = False
-                for d2 in prop["array_item_constraints"]:
-                    if d1["name"] == d2["name"] and d1["value"] == d2["value"]:
-                        is_array_item_constraint = True
+                is_array_item_constraint = (d1["name"], d1["value"]) in array_item_constraints
                 if not is_array_item_constraint and not (
-                    p.is_array() == False
+                    is_array == False
                     and (d1["name"] == "maxItems" or d1["name"] == "minItems")
                 ):
                     prop["constraints"].append(d1)
             prop["constraint_count"] = len(prop["constraints"])
-            if self.is_conflict(properties, prop) == False:
+            # the same property may already be in the list if different nodeshapes with the same
+            # targetclass define SHACL property constraints on the same properties of the shared targetclass.
+            if prop["iri"] not in property_iris:
+                property_iris.add(prop["iri"])
                 properties.append(prop)
             else:
                 msg = "Cannot produce well-formed JSON-SCHEMA: The SHACL property for {} defined in shape {} conflicts with another SHACL property for the same {} defined in the same shape or another shape.".format(
@@ -308,20 +338,11 @@ class JsonSchemaRenderer:
                 raise ConflictingPropertyException(msg)
         return properties
 
-    def is_conflict(self, properties: List[dict], property: dict):
-        # check if the specified property is already in the list of properties
-        # this can happen if different nodeshapes with the same targetclass
-        # define SHACL property constraints on the same properties of the shared targetclass.
-        for p in properties:
-            if p["iri"] == property["iri"]:
-                return True
-        return False
-
     def render_nodeshape(self, shape_iri: str) -> str:
         log.info("Rendering JSON-SCHEMA for {}".format(shape_iri))
         s = SemanticModel(shape_iri)
         shape_list = s.get_node_shapes()
-        shapes = list(filter(lambda s: s.iri == shape_iri, shape_list))
+        shapes = [s for s in shape_list if s.iri == shape_iri]
         content = None
         if len(shapes) == 0 or len(shapes) > 1:
             log.warn("{} shape(s) found for iri '{}'".format(len(shapes), shape_iri))
@@ -336,7 +357,7 @@ class JsonSchemaRenderer:
         else:
             shape = shapes[0]
             properties = self.get_data_for_shape(shape)
-            required = list(filter(lambda p: p["is_required"] == True, properties))
+            required = [p for p in properties if p["is_required"] == True]
             content = self.env.get_template("render_model.jsonschema").render(
                 shape_iri=shape_iri,
                 shape_label=shape.label,  # TODO: use target class label if shape label is empty
@@ -345,10 +366,10 @@ class JsonSchemaRenderer:
                 required=required,
                 required_count=len(required),
             )
-        d = multiline.loads(
-            content, multiline=True
-        )  # this ensures template generated valid JSON...
-        return multiline.dumps(
+        d = json.loads(
+            content.replace("\t", " "), strict=False
+        )  # this ensures template generated valid JSON (strict=False accepts line breaks in descriptions)...
+        return json.dumps(
             d, indent=5
         )  # ...and we can return properly formatted JSON (while keeping the template code readable)
 
@@ -360,11 +381,20 @@ class HtmlRenderer:
             tolerance=Mode.STRICT,
             undefined=StrictUndefined,
             loader=FileSystemLoader(template_path),
+            auto_reload=False,
         )
         self.env.add_filter("prune", prune_iri)
         self.env.add_filter("url", url)
-        self.env.add_filter("markdown", md.markdown)
+        self.env.add_filter("markdown", markdown)
         self.diagram_renderer = MermaidRenderer(template_path)
+        self.element_renderers = {
+            SemanticModelElement.RDFS_CLASS: self.render_class,
+            SemanticModelElement.OWL_CLASS: self.render_class,
+            SemanticModelElement.RDFS_PROPERTY: self.render_property,
+            SemanticModelElement.RDF_PROPERTY: self.render_property,
+            SemanticModelElement.SHACL_NODESHAPE: self.render_nodeshape,
+            SemanticModelElement.SHACL_PROPERTY: self.render_shacl_property,
+        }
 
     def render_page(self, base_url: str, content: str) -> str:
         return self.env.get_template("render_page.html").render(
@@ -378,14 +408,9 @@ class HtmlRenderer:
         shape_list = s.get_node_shapes()
         prop_list = s.get_properties()
         model_details = s.get_model_details()
-        model_details_keys = list(model_details.keys())
-        model_details_keys.sort(key=lambda k: prune_iri(k, True))
-        model_details_names = {}
-        for k in model_details_keys:
-            model_details_names[k] = prune_iri(k, True)
-        model_details_count = len(model_details_keys)
+        model_details_names = {k: prune_iri(k, True) for k in model_details}
+        model_details_keys = sorted(model_details_names, key=model_details_names.__getitem__)
         instances = s.get_instances()
-        instance_count = len(instances)
         instance_classes = {}
         for i in instances:
             instance_classes[i.iri] = i.get_classes()
@@ -393,23 +418,18 @@ class HtmlRenderer:
             url=base_url,
             model=s,
             model_details=model_details,
-            model_details_count=model_details_count,
             model_details_keys=model_details_keys,
             model_details_names=model_details_names,
             classes=class_list,
-            class_count=len(class_list),
             shapes=shape_list,
-            shape_count=len(shape_list),
             properties=prop_list,
-            property_count=len(prop_list),
-            instance_count=instance_count,
             instances=instances,
             instance_classes=instance_classes,
         )
         content += self.env.get_template("render_diagram.html").render(
             url = base_url,
             element = s, 
-            diagram = self.diagram_renderer.render_model(s.iri)
+            diagram = self.diagram_renderer.render_model(s.iri, s.graph)
         )        
         return self.render_page(base_url, content)
 
@@ -418,14 +438,9 @@ class HtmlRenderer:
         s = SemanticModel(iri)
         content = ""
         for t in s.get_types_of_instance(iri):
-            if t == s.RDFS_CLASS or t == s.OWL_CLASS:
-                content += self.render_class(base_url, s)
-            elif t == s.RDFS_PROPERTY or t == s.RDF_PROPERTY:
-                content += self.render_property(base_url, s)
-            elif t == s.SHACL_NODESHAPE:
-                content += self.render_nodeshape(base_url, s)
-            elif t == s.SHACL_PROPERTY:
-                content += self.render_shacl_property(base_url, s)
+            render = self.element_renderers.get(t)
+            if render is not None:
+                content += render(base_url, s)
             elif s.is_instance(iri):
                 content += self.render_instance(base_url, s)
         if content == "" or content is None:
@@ -435,41 +450,38 @@ class HtmlRenderer:
             log.error(msg)
             raise NotFoundException(msg)
         log.info("HTML rendering full page for model element at {}".format(iri))
-        content += self.render_predicates(SemanticModelElement(iri))
+        content += self.render_predicates(SemanticModelElement(iri, s.graph))
         return self.render_page(base_url, content)
 
     def render_class(self, base_url: str, model: SemanticModel) -> str:
         log.info("HTML rendering class at {}".format(model.iri))
-        for c in model.get_classes():
-            if c.iri == model.iri:
-                prop_types = {}
-                for p in c.get_properties():
-                    prop_types[p.iri] = []
-                    for t in p.get_property_type():
-                        prop_types[p.iri].append(t)
-                instances = c.get_instances()
-                instance_count = len(instances)
-                content = self.env.get_template("render_class.html").render(
-                    url=base_url,
-                    model=model,
-                    model_iri=c.iri[0 : c.iri.rfind("/")],
-                    the_class=c,
-                    types=c.get_types(),
-                    properties=c.get_properties(),
-                    prop_count=len(c.get_properties()),
-                    prop_types=prop_types,
-                    superclasses=c.get_superclasses(),
-                    shapes=c.get_nodeshapes(),
-                    instances=instances,
-                    instance_count=instance_count,
-                )
-                diagram = self.env.get_template("render_diagram.html").render(
-                    url = base_url,
-                    element = c, 
-                    diagram = self.diagram_renderer.render_class(c.iri)
-                )
-                return content + diagram
-                
+        c = model.get_class(model.iri)
+        if c is not None:
+            properties = c.get_properties()
+            prop_types = {p.iri: list(p.get_property_type()) for p in properties}
+            instances = c.get_instances()
+            instance_count = len(instances)
+            content = self.env.get_template("render_class.html").render(
+                url=base_url,
+                model=model,
+                model_iri=get_model_iri(c.iri),
+                the_class=c,
+                types=c.get_types(),
+                properties=properties,
+                prop_count=len(properties),
+                prop_types=prop_types,
+                superclasses=c.get_superclasses(),
+                shapes=c.get_nodeshapes(),
+                instances=instances,
+                instance_count=instance_count,
+            )
+            diagram = self.env.get_template("render_diagram.html").render(
+                url = base_url,
+                element = c, 
+                diagram = self.diagram_renderer.render_class(c.iri, model.graph)
+            )
+            return content + diagram
+            
     def render_predicates(self, element:SemanticModelElement) -> str:
         log.info("HTML rendering predicates for {}".format(element.iri))
         return self.env.get_template("render_predicates.html").render(
@@ -479,89 +491,84 @@ class HtmlRenderer:
 
     def render_instance(self, base_url: str, model: SemanticModel) -> str:
         log.info("HTML rendering instance at {}".format(model.iri))
-        for i in model.get_instances():
-            if i.iri == model.iri:
-                return self.env.get_template("render_instance.html").render(
-                    url=base_url,
-                    model_iri=i.iri[0 : i.iri.rfind("/")],
-                    instance=i,
-                    classes=i.get_classes(),
-                )
+        i = model.get_instance(model.iri)
+        if i is not None:
+            return self.env.get_template("render_instance.html").render(
+                url=base_url,
+                model_iri=get_model_iri(i.iri),
+                instance=i,
+                classes=i.get_classes(),
+            )
 
     def render_property(self, base_url: str, model: SemanticModel) -> str:
         log.info("HTML rendering property at {}".format(model.iri))
-        for p in model.get_properties():
-            if p.iri == model.iri:
-                shacl_props = p.get_shacl_properties()
-                prop_shapes = {}
-                prop_constraints = {}
-                for sp in shacl_props:
-                    prop_shapes[sp.iri] = list(
-                        map(lambda n: n.iri, sp.get_nodeshapes())
-                    )
-                    prop_constraints[sp.iri] = sp.get_constraints()
-                return self.env.get_template("render_property.html").render(
-                    url=base_url,
-                    model=model,
-                    model_iri=p.iri[0 : p.iri.rfind("/")],
-                    property=p,
-                    types=p.get_types(),
-                    classes=p.get_classes(),
-                    prop_type=p.get_property_type(),
-                    superprop=p.get_superproperties(),
-                    shacl_props=shacl_props,
-                    shacl_prop_count=len(shacl_props),
-                    shacl_prop_shapes=prop_shapes,
-                    shacl_prop_constraints=prop_constraints,
-                )
+        p = model.get_property(model.iri)
+        if p is not None:
+            shacl_props = p.get_shacl_properties()
+            prop_shapes = {}
+            prop_constraints = {}
+            for sp in shacl_props:
+                prop_shapes[sp.iri] = [shape.iri for shape in sp.get_nodeshapes()]
+                prop_constraints[sp.iri] = sp.get_constraints()
+            return self.env.get_template("render_property.html").render(
+                url=base_url,
+                model=model,
+                model_iri=get_model_iri(p.iri),
+                property=p,
+                types=p.get_types(),
+                classes=p.get_classes(),
+                prop_type=p.get_property_type(),
+                superprop=p.get_superproperties(),
+                shacl_props=shacl_props,
+                shacl_prop_count=len(shacl_props),
+                shacl_prop_shapes=prop_shapes,
+                shacl_prop_constraints=prop_constraints,
+            )
 
     def render_nodeshape(self, base_url: str, model: SemanticModel) -> str:
         log.info("HTML rendering nodeshape at {}".format(model.iri))
-        for n in model.get_node_shapes():
-            if n.iri == model.iri:
-                shacl_props = n.get_shacl_properties()
-                prop_shapes = {}
-                prop_constraints = {}
-                for sp in shacl_props:
-                    prop_shapes[sp.iri] = list(
-                        map(lambda n: n.iri, sp.get_nodeshapes())
-                    )
-                    prop_constraints[sp.iri] = sp.get_constraints()
-                content = self.env.get_template("render_shape.html").render(
-                    url=base_url,
-                    model=model,
-                    model_iri=n.iri[0 : n.iri.rfind("/")],
-                    shape=n,
-                    types=n.get_types(),
-                    classes=n.get_classes(),
-                    shacl_props=shacl_props,
-                    shacl_prop_count=len(shacl_props),
-                    shacl_prop_shapes=prop_shapes,
-                    shacl_prop_constraints=prop_constraints,
-                )
-                diagram = self.env.get_template("render_diagram.html").render(
-                    url = base_url,
-                    element = n, 
-                    diagram = self.diagram_renderer.render_nodeshape(n.iri)
-                )
-                return content + diagram
-                
+        n = model.get_node_shape(model.iri)
+        if n is not None:
+            shacl_props = n.get_shacl_properties()
+            prop_shapes = {}
+            prop_constraints = {}
+            for sp in shacl_props:
+                prop_shapes[sp.iri] = [shape.iri for shape in sp.get_nodeshapes()]
+                prop_constraints[sp.iri] = sp.get_constraints()
+            content = self.env.get_template("render_shape.html").render(
+                url=base_url,
+                model=model,
+                model_iri=get_model_iri(n.iri),
+                shape=n,
+                types=n.get_types(),
+                classes=n.get_classes(),
+                shacl_props=shacl_props,
+                shacl_prop_count=len(shacl_props),
+                shacl_prop_shapes=prop_shapes,
+                shacl_prop_constraints=prop_constraints,
+            )
+            diagram = self.env.get_template("render_diagram.html").render(
+                url = base_url,
+                element = n, 
+                diagram = self.diagram_renderer.render_nodeshape(n.iri, model.graph)
+            )
+            return content + diagram
+            
 
     def render_shacl_property(self, base_url: str, model: SemanticModel) -> str:
         log.info("HTML rendering SHACL property at {}".format(model.iri))
-        shacl_props = model.get_shacl_properties()
-        for sp in shacl_props:
-            if sp.iri == model.iri:
-                prop_shapes = sp.get_nodeshapes()
-                prop_constraints = sp.get_constraints()
-                constraint_count = len(prop_constraints)
-                return self.env.get_template("render_shacl_property.html").render(
-                    url=base_url,
-                    model=model,
-                    model_iri=sp.iri[0 : sp.iri.rfind("/")],
-                    property=sp,
-                    types=sp.get_types(),
-                    shapes=prop_shapes,
-                    constraints=prop_constraints,
-                    constraint_count=constraint_count
-                )
+        sp = model.get_shacl_property(model.iri)
+        if sp is not None:
+            prop_shapes = sp.get_nodeshapes()
+            prop_constraints = sp.get_constraints()
+            constraint_count = len(prop_constraints)
+            return self.env.get_template("render_shacl_property.html").render(
+                url=base_url,
+                model=model,
+                model_iri=get_model_iri(sp.iri),
+                property=sp,
+                types=sp.get_types(),
+                shapes=prop_shapes,
+                constraints=prop_constraints,
+                constraint_count=constraint_count
+            )
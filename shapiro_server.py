@@ -60,6 +60,8 @@ SUPPORTED_MIME_TYPES = [
 CONTENT_DIR = "./"
 INDEX_DIR = "./fts_index"
 BAD_SCHEMAS = {}
+RENDER_CACHE = {}  # (path, mime type, content hash) -> rendered content
+RENDER_CACHE_SIZE = 256
 ROUTES = None
 HOUSEKEEPERS = []
 
@@ -83,6 +85,7 @@ env = Environment(
     tolerance=Mode.STRICT,
     undefined=StrictUndefined,
     loader=FileSystemLoader(HOME + "/templates/"),
+    auto_reload=False,
 )
 
 
@@ -644,13 +647,17 @@ def convert(path: str, filename: str, content: str, mime_type: str):
     if mime_type == MIME_HTML:
         if filename[0 : filename.rfind(".")].endswith(path):
             return {
-                "content": HTML_RENDERER.render_model(BASE_URL, BASE_URL + path),
+                "content": render_cached(
+                    path, content, mime_type,
+                    lambda: HTML_RENDERER.render_model(BASE_URL, BASE_URL + path),
+                ),
                 "mime_type": mime_type,
             }
         else:
             return {
-                "content": HTML_RENDERER.render_model_element(
-                    BASE_URL, BASE_URL + path
+                "content": render_cached(
+                    path, content, mime_type,
+                    lambda: HTML_RENDERER.render_model_element(BASE_URL, BASE_URL + path),
                 ),
                 "mime_type": mime_type,
             }
@@ -694,6 +701,23 @@ def convert(path: str, filename: str, content: str, mime_type: str):
     return None
 
 
+def render_cached(path: str, content: str, mime_type: str, render) -> str:
+    """
+    Return the rendered content for the specified path and mime type, calling
+    render() only if the schema content changed since it was last rendered.
+    Only use this for content rendered from that one schema: JSON-SCHEMA
+    resolves $refs against other schemas and is therefore never cached.
+    """
+    key = (path, mime_type, hash(content))
+    result = RENDER_CACHE.get(key)
+    if result is None:
+        result = render()
+        if len(RENDER_CACHE) >= RENDER_CACHE_SIZE:
+            RENDER_CACHE.pop(next(iter(RENDER_CACHE)), None)  # evict the oldest entry
+        RENDER_CACHE[key] = result
+    return result
+
+
 def map_filename(path: str):
     """
     Take the hierarchical path specified and identify the file with the ontology content that this
@@ -1,5 +1,7 @@
 from urllib.parse import urlparse
+from functools import lru_cache
 import colorlog
+import re
 import logging
 
 handler = colorlog.StreamHandler()
@@ -31,36 +33,59 @@ class ConflictingPropertyException(Exception):
     def __init__(self, content: str):
         self.content = content
 
+KNOWN_PREFIXES = {
+    "http://www.w3.org/2000/01/rdf-schema#": "rdfs:",
+    "http://www.w3.org/2004/02/skos/core#": "skos:",
+    "http://purl.org/dc/terms/": "dct:",
+    "http://www.w3.org/2002/07/owl#": "owl:",
+    "http://www.w3.org/ns/shacl#": "shacl:",
+    "http://www.w3.org/1999/02/22-rdf-syntax-ns#": "rdf:",
+    "http://schema.org": "schema:",
+    "http://www.w3.org/ns/adms#": "adms:",
+    "http://www.w3.org/2001/XMLSchema#": "xsd:",
+    "http://http://xmlns.com/foaf/0.1/": "foaf:",
+    "http://dbpedia.org/resource/": "dbpedia:",
+    "http://www.w3.org/ns/odrl1/2/": "odrl:",
+    "http://www.w3.org/ns/org#": "org:",
+    "http://www.w3.org/2006/time#": "time:",
+    "http://www.w3.org/TR/vocab-dcat-2/#": "dcat:",
+    "https://www.w3.org/ns/dcat#": "dcat:",
+    "http://purl.org/adms/status/": "adms:",
+    "http://xmlns.com/foaf/0.1/": "foaf:",
+}
+
+# lowercased once, longest namespace first
+PREFIX_TABLE = tuple(
+    sorted(((k.lower(), v) for k, v in KNOWN_PREFIXES.items()), key=lambda kv: -len(kv[0]))
+)
+
+
 def prefix(iri: str, name: str) -> str:
-    known = {
-        "http://www.w3.org/2000/01/rdf-schema#": "rdfs:",
-        "http://www.w3.org/2004/02/skos/core#": "skos:",
-        "http://purl.org/dc/terms/": "dct:",
-        "http://www.w3.org/2002/07/owl#": "owl:",
-        "http://www.w3.org/ns/shacl#": "shacl:",
-        "http://www.w3.org/1999/02/22-rdf-syntax-ns#": "rdf:",
-        "http://schema.org": "schema:",
-        "http://www.w3.org/ns/adms#": "adms:",
-        "http://www.w3.org/2001/XMLSchema#": "xsd:",
-        "http://http://xmlns.com/foaf/0.1/": "foaf:",
-        "http://dbpedia.org/resource/": "dbpedia:",
-        "http://www.w3.org/ns/odrl1/2/": "odrl:",
-        "http://www.w3.org/ns/org#": "org:",
-        "http://www.w3.org/2006/time#": "time:",
-        "http://www.w3.org/TR/vocab-dcat-2/#": "dcat:",
-        "https://www.w3.org/ns/dcat#": "dcat:",
-        "http://purl.org/adms/status/": "adms:",
-        "http://xmlns.com/foaf/0.1/": "foaf:",
-    }
-    for k in known.keys():
-        if iri.lower().startswith(k.lower()):
-            return known[k] + name
+    iri = iri.lower()
+    for namespace, short in PREFIX_TABLE:
+        if iri.startswith(namespace):
+            return short + name
     return name
 
 
+# scheme and "//" of an iri with a host name, as urlparse reads them; iris without
+# one, or with a query or parameters, are still left to urlparse
+AUTHORITY = re.compile(r"[A-Za-z][A-Za-z0-9+.\-]*://")
+
+
+@lru_cache(maxsize=8192)
 def prune_iri(iri: str, name_only: bool = False) -> str:
-    url = urlparse(iri)
-    result = url.path.strip("/")
-    result = result.split("/")[-1] if not url.fragment else url.fragment
+    fragment = iri.find("#")
+    authority = AUTHORITY.match(iri)
+    if 0 < fragment < len(iri) - 1:
+        result = iri[fragment + 1 :]
+    elif fragment < 0 and authority is not None and "?" not in iri and ";" not in iri:
+        # the path starts after the host name, if there is one
+        path = iri.find("/", authority.end())
+        result = iri[path:].strip("/").split("/")[-1] if path > 0 else ""
+    else:
+        url = urlparse(iri)
+        result = url.path.strip("/")
+        result = result.split("/")[-1] if not url.fragment else url.fragment
     if not name_only: result = prefix(iri, result)
     return result
\ No newline at end of file
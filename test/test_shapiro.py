@@ -3,8 +3,12 @@ import pytest
 from time import sleep
 import shutil
 import shapiro_server
+import shapiro_model
 from shapiro_util import BadSchemaException, NotFoundException, prune_iri
-from shapiro_model import Subscriptable
+from shapiro_model import Subscriptable, ShaclProperty, SemanticModelElement, NodeShape, SemanticModel, get_element, is_blank_node, get_linked_graph, prefetch_linked_graphs
+from rdflib import Graph, URIRef
+from rdflib.namespace import SH
+from rdflib.plugins.sparql import prepareQuery
 from shapiro_render import JsonSchemaRenderer
 from shapiro_content import GitHubAdaptor, GitHubException, FileSystemAdaptor
 import subprocess
@@ -540,6 +544,67 @@ def test_convert_with_unkown_mime_yields_none():
     assert result is None
 
 
+def test_render_cached_renders_again_only_for_changed_content():
+    calls = []
+    render = lambda: calls.append(1) or "rendered {}".format(len(calls))
+    first = shapiro_server.render_cached("a/path", "content", "text/html", render)
+    again = shapiro_server.render_cached("a/path", "content", "text/html", render)
+    changed = shapiro_server.render_cached("a/path", "changed", "text/html", render)
+    assert first == again == "rendered 1"
+    assert changed == "rendered 2"
+
+
+REFERENCING_SCHEMA = """
+@prefix : <http://127.0.0.1:8000/com/example/org/json_schema_referencing/> .
+@prefix r: <http://127.0.0.1:8000/com/example/org/json_schema_referenced/> .
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+@prefix sh: <http://www.w3.org/ns/shacl#> .
+
+:AShape a sh:NodeShape ;
+    rdfs:label "AShape" ;
+    sh:property [ sh:path :thing ; sh:class r:Thing ] .
+
+:ThingShape a sh:NodeShape ;
+    rdfs:label "ThingShape" ;
+    sh:targetClass r:Thing .
+"""
+
+REFERENCED_SCHEMA = """
+@prefix : <http://127.0.0.1:8000/com/example/org/json_schema_referenced/> .
+@prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+
+:Thing a {} ;
+    rdfs:label "Thing" .
+"""
+
+
+def test_json_schema_follows_changes_to_referenced_schema():
+    # the $ref depends on what the referenced schema says r:Thing is, so the
+    # JSON-SCHEMA must change with it even though the requested schema did not
+    mime = "application/schema+json"
+    referencing = "test/ontologies/com/example/org/json_schema_referencing.ttl"
+    referenced = "test/ontologies/com/example/org/json_schema_referenced.ttl"
+    path = "/com/example/org/json_schema_referencing/AShape"
+    try:
+        with open(referencing, "w") as f:
+            f.write(REFERENCING_SCHEMA)
+        with open(referenced, "w") as f:
+            f.write(REFERENCED_SCHEMA.format("rdfs:Class"))
+        response = client.get(path, headers={"accept": mime})
+        assert response.status_code == 200
+        assert "json_schema_referencing/ThingShape" in response.text
+        with open(referenced, "w") as f:
+            f.write(REFERENCED_SCHEMA.format("rdfs:Resource"))
+        response = client.get(path, headers={"accept": mime})
+        assert response.status_code == 200
+        assert "json_schema_referencing/ThingShape" not in response.text
+        assert "json_schema_referenced/Thing" in response.text
+    finally:
+        for f in [referencing, referenced]:
+            if os.path.exists(f):
+                os.remove(f)
+
+
 def test_get_existing_nodeshape_as_json_schema():
     mime = "application/schema+json"
     response = client.get(
@@ -556,9 +621,17 @@ def test_enums_with_json_schema():
         "/com/example/org/model_for_jsonschema/EnumExampleShape",
         headers={"accept": mime},
     )
-    response.json()  # ensure JSON-SCHEMA generated is proper JSON
+    schema = response.json()  # ensure JSON-SCHEMA generated is proper JSON
     assert response.headers["content-type"].startswith(mime)
     assert response.status_code == 200
+    # sh:in lists of blank node SHACL properties are rendered, not just named ones
+    properties = schema["properties"]
+    assert properties["hasMiddleName"]["enum"] == ["William", "Wilhelmine"]
+    assert properties["enumExampleName"]["enum"] == ["Jane", "John", "Joe", "Janet"]
+    assert properties["enumExampleAge"]["enum"] == [5, 10, 25, 38, 47, 56, 62]
+    assert properties["enumExampleFavoriteNumber"]["items"]["enum"] == [5, 10, 25, 38, 47, 56, 62]
+    iri = "http://127.0.0.1:8000/com/example/org/model_for_jsonschema/"
+    assert properties["hasName"]["enum"] == [iri + n for n in ["joe", "john", "jane", "janet"]]
 
 def test_subproperty_option_1_with_json_schema():
     mime = "application/schema+json"
@@ -668,12 +741,307 @@ def test_prune():
     assert p == "c"
 
 
+def test_prune_with_known_prefix():
+    assert prune_iri("http://www.w3.org/2001/XMLSchema#string") == "xsd:string"
+    assert prune_iri("HTTP://SCHEMA.ORG/Person") == "schema:Person"
+    assert prune_iri("http://purl.org/adms/status/Completed") == "adms:Completed"
+    assert prune_iri("http://example.org/Thing") == "Thing"
+
+
+def test_prune_matches_urlparse_path_and_fragment():
+    assert prune_iri("http://example.org/a/b/", True) == "b"
+    assert prune_iri("http://example.org/a#b", True) == "b"
+    assert prune_iri("http://example.org/a#", True) == "a"
+    assert prune_iri("http://example.org", True) == ""
+    assert prune_iri("http://example.org/a/b?c=d/e", True) == "b"
+    assert prune_iri("urn:isbn:123", True) == "isbn:123"
+
+
 def test_subscriptable():
     s = Subscriptable()
     with pytest.raises(Exception):
         s["non_existing_key"]
 
 
+SHACL_SAMPLE = """
+    @prefix : <http://example.org/shapes/> .
+    @prefix sh: <http://www.w3.org/ns/shacl#> .
+    @prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+    :Name a sh:PropertyShape ; rdfs:label "Name" .
+    :AShape a sh:NodeShape ; rdfs:label "AShape" ;
+        sh:property :Name ;
+        sh:property [ sh:path :age ; sh:maxCount 1 ] .
+    :BShape a sh:NodeShape ; rdfs:label "BShape" ;
+        sh:property :Name .
+"""
+
+SHAPE_QUERY = prepareQuery(
+    """
+        PREFIX sh:<http://www.w3.org/ns/shacl#>
+        SELECT DISTINCT ?shape
+        WHERE
+        {
+            ?shape sh:property ?property .
+        }
+    """
+)
+
+
+def shapes_from_query(g: Graph, prop) -> list:
+    return sorted(str(r.shape) for r in g.query(SHAPE_QUERY, initBindings={"property": prop}))
+
+
+def test_subscript_access_on_slotted_element():
+    g = Graph().parse(data=SHACL_SAMPLE, format="ttl")
+    shape = NodeShape("http://example.org/shapes/AShape", g)
+    assert not hasattr(shape, "__dict__")
+    assert shape["label"] == "AShape"
+    assert [p.label for p in shape["get_shacl_properties"]] == [p.label for p in shape.get_shacl_properties()]
+    with pytest.raises(Exception):
+        shape["non_existing_key"]
+
+
+def test_shacl_property_nodeshapes_for_shared_property():
+    g = Graph().parse(data=SHACL_SAMPLE, format="ttl")
+    prop = URIRef("http://example.org/shapes/Name")
+    shapes = [s.iri for s in ShaclProperty(str(prop), g).get_nodeshapes()]
+    assert len(shapes) == 2
+    assert sorted(shapes) == shapes_from_query(g, prop)
+
+
+def test_shacl_property_nodeshapes_for_blank_node():
+    g = Graph().parse(data=SHACL_SAMPLE, format="ttl")
+    bnode = next(o for o in g.objects(None, SH.property) if not isinstance(o, URIRef))
+    shapes = [s.iri for s in ShaclProperty(str(bnode), g).get_nodeshapes()]
+    assert shapes == ["http://example.org/shapes/AShape"]
+    assert shapes == shapes_from_query(g, bnode)
+
+
+def test_shacl_property_constraints_only_from_shacl_namespace():
+    g = Graph().parse(data=SHACL_SAMPLE, format="ttl")
+    bnode = next(o for o in g.objects(None, SH.property) if not isinstance(o, URIRef))
+    constraints = ShaclProperty(str(bnode), g).get_constraints()
+    assert [(c.constraint_iri, c.value) for c in constraints] == [
+        (str(SH.maxCount), "1"),
+        (str(SH.path), "http://example.org/shapes/age"),
+    ]
+    unordered = ShaclProperty(str(bnode), g).iter_constraints()
+    assert sorted((c.constraint_iri, c.value) for c in unordered) == [(c.constraint_iri, c.value) for c in constraints]
+    name = ShaclProperty("http://example.org/shapes/Name", g)
+    assert [c.constraint_iri for c in name.get_constraints()] == []
+
+
+def test_shacl_property_constraints_with_enum_and_super_property():
+    g = Graph().parse(data="""
+        @prefix : <http://example.org/shapes/> .
+        @prefix sh: <http://www.w3.org/ns/shacl#> .
+        @prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+        :Colour sh:path :colour ; sh:in ("red" "green" "blue") ; rdfs:subPropertyOf :Named .
+        :Named sh:minCount 1 .
+    """, format="ttl")
+    p = ShaclProperty("http://example.org/shapes/Colour", g)
+    assert p.is_required()
+    enum = [c for c in p.get_constraints() if c.is_enum]
+    assert len(enum) == 1
+    assert [str(v) for v in enum[0].value] == ["red", "green", "blue"]
+
+
+def test_shacl_property_json_schema_type_by_datatype_name():
+    g = Graph().parse(data="""
+        @prefix : <http://example.org/shapes/> .
+        @prefix sh: <http://www.w3.org/ns/shacl#> .
+        @prefix xsd: <http://www.w3.org/2001/XMLSchema#> .
+        :Created sh:path :created ; sh:datatype xsd:dateTime .
+        :Time sh:path :time ; sh:datatype xsd:time .
+        :Age sh:path :age ; sh:datatype xsd:positiveInteger ; sh:minInclusive 0 .
+        :Tag sh:path :tag ; sh:datatype xsd:QName .
+    """, format="ttl")
+    assert ShaclProperty("http://example.org/shapes/Tag", g).get_json_schema_type() == ("string", None)
+    assert ShaclProperty("http://example.org/shapes/Created", g).get_json_schema_type() == ("string", "date-time")
+    assert ShaclProperty("http://example.org/shapes/Time", g).get_json_schema_type() == ("string", "time")
+    age = ShaclProperty("http://example.org/shapes/Age", g)
+    assert age.get_json_schema_type() == ("integer", None)
+    assert [c.get_json_schema_name() for c in age.get_constraints()] == [None, "minimum", None]
+
+
+def test_nodeshape_inherited_shacl_properties():
+    g = Graph().parse(data="""
+        @prefix : <http://example.org/shapes/> .
+        @prefix sh: <http://www.w3.org/ns/shacl#> .
+        @prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+        :Student rdfs:subClassOf :Person .
+        :Person rdfs:subClassOf :Agent .
+        :StudentShape sh:targetClass :Student ; sh:property [ sh:path :school ] .
+        :PersonShape sh:targetClass :Person ; sh:property [ sh:path :name ] .
+        :AgentShape sh:targetClass :Agent ; sh:property [ sh:path :id ] .
+    """, format="ttl")
+    shape = NodeShape("http://example.org/shapes/StudentShape", g)
+    inherited = [p.get_target_property().iri for p in shape.get_inherited_shacl_properties()]
+    assert sorted(inherited) == ["http://example.org/shapes/id", "http://example.org/shapes/name"]
+
+
+def test_shacl_property_nodeshape_for_locally_typed_class(monkeypatch):
+    g = Graph().parse(data="""
+        @prefix : <http://example.org/shapes/> .
+        @prefix sh: <http://www.w3.org/ns/shacl#> .
+        @prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+        :Address a rdfs:Class .
+        :AddressShape a sh:NodeShape ; sh:targetClass :Address .
+        :HomeAddress sh:path :home ; sh:class :Address .
+    """, format="ttl")
+    # resolved without fetching http://example.org/shapes/Address
+    fetched = []
+    monkeypatch.setattr(shapiro_model, "fetch_graph", lambda document: fetched.append(document))
+    p = ShaclProperty("http://example.org/shapes/HomeAddress", g)
+    assert p.get_json_schema_type() == ("http://example.org/shapes/AddressShape", None)
+    assert fetched == []
+
+
+def test_shacl_property_nodeshapes_after_graph_change():
+    g = Graph().parse(data=SHACL_SAMPLE, format="ttl")
+    prop = URIRef("http://example.org/shapes/Name")
+    assert len(ShaclProperty(str(prop), g).get_nodeshapes()) == 2
+    g.add((URIRef("http://example.org/shapes/CShape"), SH.property, prop))
+    assert len(ShaclProperty(str(prop), g).get_nodeshapes()) == 3
+
+
+def test_get_element_is_memoized_per_graph():
+    g = Graph().parse(data=SHACL_SAMPLE, format="ttl")
+    iri = "http://example.org/shapes/AShape"
+    shape = get_element(NodeShape, iri, g)
+    assert shape.label == "AShape"
+    assert get_element(NodeShape, iri, g) is shape
+    assert get_element(NodeShape, iri, Graph().parse(data=SHACL_SAMPLE, format="ttl")) is not shape
+    g.add((URIRef(iri), SH.property, URIRef("http://example.org/shapes/Other")))
+    assert get_element(NodeShape, iri, g) is not shape
+
+
+def test_label_and_descriptions_with_multiple_comments():
+    g = Graph().parse(data="""
+        @prefix : <http://example.org/shapes/> .
+        @prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+        :Thing rdfs:label "Thing" ; rdfs:comment "first"@en, "zweite"@de .
+    """, format="ttl")
+    e = SemanticModelElement("http://example.org/shapes/Thing", g)
+    assert e.label == "Thing"
+    assert e.comment in ["first", "zweite"]
+    assert e.description == "n/a"
+
+
+def test_is_blank_node_matches_urlparse_scheme():
+    for iri in ["http://example.org/a", "urn:isbn:123", "mailto:someone@example.org"]:
+        assert not is_blank_node(iri)
+    for iri in ["N5d7c0e4f", "_:b0", "1abc:def", "some literal value", ""]:
+        assert is_blank_node(iri)
+
+
+def test_linked_graph_is_fetched_once_per_document(tmp_path):
+    doc = tmp_path / "linked.ttl"
+    doc.write_text(SHACL_SAMPLE)
+    g = Graph().parse(data=SHACL_SAMPLE, format="ttl")
+    linked = get_linked_graph(doc.as_uri() + "#AShape", g)
+    assert len(linked) == len(g)
+    assert get_linked_graph(doc.as_uri() + "#BShape", g) is linked
+    missing = (tmp_path / "missing.ttl").as_uri()
+    with pytest.raises(Exception):
+        get_linked_graph(missing, g)
+    (tmp_path / "missing.ttl").write_text(SHACL_SAMPLE)
+    with pytest.raises(Exception):
+        get_linked_graph(missing, g)
+
+
+def test_prefetch_linked_graphs(tmp_path):
+    iris = []
+    for name in ["a.ttl", "b.ttl"]:
+        (tmp_path / name).write_text(SHACL_SAMPLE)
+        iris.append((tmp_path / name).as_uri() + "#AShape")
+    g = Graph().parse(data=SHACL_SAMPLE, format="ttl")
+    prefetch_linked_graphs(iris + [(tmp_path / "missing.ttl").as_uri()], g)
+    for name in ["a.ttl", "b.ttl"]:
+        (tmp_path / name).unlink()
+    for iri in iris:
+        assert len(get_linked_graph(iri, g)) == len(g)
+    with pytest.raises(Exception):
+        get_linked_graph((tmp_path / "missing.ttl").as_uri(), g)
+
+
+def test_labels_are_read_on_first_access():
+    g = Graph().parse(data=SHACL_SAMPLE, format="ttl")
+    lookups = []
+    value = g.value
+    g.value = lambda *args, **kwargs: lookups.append(args) or value(*args, **kwargs)
+    shape = NodeShape("http://example.org/shapes/AShape", g)
+    assert lookups == []
+    assert shape["label"] == "AShape"
+    read = len(lookups)
+    assert shape.comment == "n/a"
+    assert len(lookups) == read  # all descriptions are read together, once
+    with pytest.raises(AttributeError):
+        shape.label = "changed"
+    assert NodeShape("http://example.org/shapes/Unlabelled", g).title == "Unlabelled"
+    assert NodeShape("N1234", g).label == "unnamed"
+
+
+def test_model_query_results_follow_graph_changes():
+    g = Graph().parse(data="""
+        @prefix : <http://example.org/model/> .
+        @prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+        :Person a rdfs:Class .
+        :alice a :Person .
+    """, format="ttl")
+    model = SemanticModel("http://example.org/model/", g)
+    assert model.is_instance("http://example.org/model/alice")
+    assert not model.is_instance("http://example.org/model/bob")
+    g.parse(data="<http://example.org/model/bob> a <http://example.org/model/Person> .", format="ttl")
+    assert model.is_instance("http://example.org/model/bob")
+    assert [i.iri for i in model.get_instances()] == ["http://example.org/model/alice", "http://example.org/model/bob"]
+
+
+def test_model_single_element_getters():
+    g = Graph().parse(data="""
+        @prefix : <http://example.org/model/> .
+        @prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+        @prefix rdf: <http://www.w3.org/1999/02/22-rdf-syntax-ns#> .
+        @prefix sh: <http://www.w3.org/ns/shacl#> .
+        :Person a rdfs:Class .
+        :name a rdf:Property .
+        :alice a :Person .
+        :PersonShape a sh:NodeShape ; sh:property :NameShape .
+        :AgeShape a sh:Property .
+    """, format="ttl")
+    model = SemanticModel("http://example.org/model/", g)
+    p = "http://example.org/model/"
+    assert sorted(sp.iri for sp in model.get_shacl_properties()) == [p + "AgeShape", p + "NameShape"]
+    assert model.get_class(p + "Person") in model.get_classes()
+    assert model.get_property(p + "name") in model.get_properties()
+    assert model.get_instance(p + "alice") in model.get_instances()
+    assert model.get_node_shape(p + "PersonShape") in model.get_node_shapes()
+    assert model.get_shacl_property(p + "NameShape") in model.get_shacl_properties()
+    assert model.get_class(p + "alice") is None
+    assert model.get_property(p + "Person") is None
+    assert model.get_instance(p + "Person") is None
+    assert model.get_node_shape(p + "Person") is None
+    assert model.get_shacl_property(p + "name") is None
+
+
+def test_predicates_share_the_predicate_label():
+    g = Graph().parse(data="""
+        @prefix : <http://example.org/model/> .
+        @prefix rdfs: <http://www.w3.org/2000/01/rdf-schema#> .
+        :knows rdfs:label "knows" .
+        :bob rdfs:label "Bob" .
+        :alice :knows :bob, "Carol" .
+    """, format="ttl")
+    alice = SemanticModelElement("http://example.org/model/alice", g)
+    predicates = sorted(alice.get_predicates(), key=lambda p: p.value_label)
+    assert [(p.iri, p.label) for p in predicates] == [("http://example.org/model/knows", "knows")] * 2
+    assert [(p.value_label, p.value_iri) for p in predicates] == [
+        ("Bob", "http://example.org/model/bob"),
+        ("Carol", ""),
+    ]
+    assert predicates[0].element is predicates[1].element
+
+
 def test_schema_housekeeping():
     s = shapiro_server.SchemaHousekeeping(shapiro_server.CONTENT_ADAPTOR, 10)
     s.perform_housekeeping_on([])